@@ -0,0 +1,41 @@
+"""
+Append-only checkpoint storage (one JSON object per line)
+"""
+
+import orjson
+
+# Compact one-line records; numpy scalars (e.g. averaged scores) serialize as-is
+LINE_OPTIONS = orjson.OPT_APPEND_NEWLINE | orjson.OPT_SERIALIZE_NUMPY
+
+def append_checkpoint(log_file, checkpoint):
+    """Append one checkpoint as a single compact JSON line"""
+    line = orjson.dumps(checkpoint, option=LINE_OPTIONS)
+    with open(log_file, 'ab') as f:
+        f.write(line)
+
+def iter_checkpoints(data_file):
+    """Yield checkpoints from a JSONL log, or from a legacy daily.json file"""
+    if not data_file.exists():
+        return
+    if data_file.suffix != '.jsonl':
+        yield from orjson.loads(data_file.read_bytes()).get("checkpoints", [])
+        return
+    with open(data_file, 'rb') as f:
+        for line in f:
+            if not line.strip():
+                continue
+            # A crash mid-append can leave one truncated line; keep the rest of the log
+            try:
+                yield orjson.loads(line)
+            except orjson.JSONDecodeError:
+                continue
+
+def migrate_daily_json(daily_file, log_file):
+    """Copy checkpoints from a legacy daily.json into a new JSONL log, once"""
+    if log_file.exists() or not daily_file.exists():
+        return
+    try:
+        checkpoints = list(iter_checkpoints(daily_file))
+    except ValueError:
+        return
+    log_file.write_bytes(b''.join(orjson.dumps(c, option=LINE_OPTIONS) for c in checkpoints))
@@ -25,3 +25,10 @@ CATEGORICAL_VALUES = {
     'stress_level': ['low', 'medium', 'high'],
     'mood': ['good', 'neutral', 'bad']
 }
+
+# Ordinal codes used internally; labels are only materialized at the I/O boundary
+STRESS_CODE = {'low': 0, 'medium': 1, 'high': 2}
+MOOD_CODE = {'bad': 0, 'neutral': 1, 'good': 2}
+
+STRESS_LABELS = ('low', 'medium', 'high')
+MOOD_LABELS = ('bad', 'neutral', 'good')
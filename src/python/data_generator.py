@@ -1,70 +1,145 @@
+import os
 import random
-import json
-from datetime import datetime, timedelta
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import orjson
+import pandas as pd
+
+from config import MOOD_CODE, MOOD_LABELS, STRESS_LABELS
+
+# Profile names, indexed by profile code (0 = normal)
+PROFILES = (
+    "normal", "athlete", "stressed", "sedentary",
+    "insomniac", "overworker", "healthy", "unhealthy"
+)
+NORMAL, ATHLETE, STRESSED, SEDENTARY, INSOMNIAC, OVERWORKER, HEALTHY, UNHEALTHY = range(8)
+
+# 70% "normal" days, the remaining 30% spread evenly over all profiles
+PROFILE_PROBS = np.full(len(PROFILES), 0.3 / len(PROFILES))
+PROFILE_PROBS[NORMAL] += 0.7
+
+def _profile_ranges(default_weekday, default_weekend, overrides):
+    """Build a (profile, is_weekend, low/high) lookup table."""
+    table = np.empty((len(PROFILES), 2, 2))
+    table[:, 0] = default_weekday
+    table[:, 1] = default_weekend
+    for code, bounds in overrides.items():
+        table[code] = bounds
+    return table
+
+SLEEP_RANGES = _profile_ranges((5.5, 9.0), (7.0, 10.0), {
+    INSOMNIAC: (3.0, 5.5), OVERWORKER: (4.0, 6.5),
+    ATHLETE: (7.5, 9.5), HEALTHY: (7.0, 8.5),
+})
+STEPS_RANGES = _profile_ranges((4000, 14000), (3000, 10000), {
+    ATHLETE: (15000, 25000), SEDENTARY: (1000, 4000),
+    STRESSED: (2000, 6000), HEALTHY: (8000, 12000),
+})
+HYDRATION_RANGES = _profile_ranges((1.5, 3.5), (1.5, 3.5), {
+    ATHLETE: (3.0, 5.0), STRESSED: (0.8, 1.8), SEDENTARY: (1.2, 2.2),
+})
+HEART_RANGES = _profile_ranges((55, 80), (55, 80), {
+    ATHLETE: (45, 60), STRESSED: (75, 90), UNHEALTHY: (70, 85),
+})
+SCREEN_RANGES = _profile_ranges((3.0, 10.0), (4.0, 12.0), {
+    OVERWORKER: (10.0, 16.0), SEDENTARY: (8.0, 14.0),
+    ATHLETE: (2.0, 5.0), HEALTHY: (3.0, 6.0),
+})
+STRESS_RANGES = _profile_ranges((0.4, 0.4), (0.4, 0.4), {
+    STRESSED: (0.8, 1.2), OVERWORKER: (0.7, 1.1),
+    ATHLETE: (0.2, 0.6), HEALTHY: (0.3, 0.7),
+})
+MOOD_RANGES = _profile_ranges((0.5, 0.5), (0.5, 0.5), {
+    STRESSED: (0.2, 0.5), ATHLETE: (0.6, 0.9), HEALTHY: (0.5, 0.8),
+})
+
+# Plain-list copies for the per-day generator: indexing nested lists with
+# Python ints is much cheaper than indexing numpy arrays one scalar at a time
+SLEEP_BOUNDS = SLEEP_RANGES.tolist()
+STEPS_BOUNDS = STEPS_RANGES.astype(int).tolist()
+HYDRATION_BOUNDS = HYDRATION_RANGES.tolist()
+HEART_BOUNDS = HEART_RANGES.astype(int).tolist()
+SCREEN_BOUNDS = SCREEN_RANGES.tolist()
+STRESS_BOUNDS = STRESS_RANGES.tolist()
+MOOD_BOUNDS = MOOD_RANGES.tolist()
+
+# Heart-rate penalty by sleep bucket: < 4h, < 6h, 6-10h, > 10h
+SLEEP_PENALTY_RANGES = np.array([(20, 35), (10, 20), (-8, 8), (5, 15)])
+
+# generate_dataset_vec draws days in chunks of CHUNK_DAYS, each from its own
+# child seed, so the data depends only on the seed and not on the worker count
+CHUNK_DAYS = 5000
+
+# Below this many days generate_dataset_vec stays in-process: spawning workers
+# costs more than it saves
+PARALLEL_MIN_DAYS = 10000
+
+# Column layout of the batch generator: one contiguous array per field.
+# Values are stored in the narrowest type that holds their range at 0.1
+# resolution; to_dataframe() widens them back to float64.
+DAY_DTYPE = np.dtype([
+    ("date", "datetime64[D]"),
+    ("sleep_hours", "f2"),
+    ("steps", "i4"),
+    ("hydration_liters", "f2"),
+    ("heart_rate_rest", "i2"),
+    ("screen_time_tenths", "i2"),
+    ("stress_code", "u1"),
+    ("mood_code", "u1"),
+    ("is_weekend", "?"),
+])
 
 def is_weekend(date):
     """Check if it's the weekend"""
     return date.weekday() >= 5
 
-def generate_extreme_profile():
-    """Generate a profile type for data diversity"""
-    profiles = [
-        "athlete", "stressed", "sedentary", "insomniac",
-        "overworker", "healthy", "unhealthy", "normal"
-    ]
+def generate_realistic_day(date, previous_day=None, is_weekend_day=None):
+    """Generate realistic data for a day"""
+    if is_weekend_day is None:
+        is_weekend_day = is_weekend(date)
 
+    # 70% of days use the plain "normal" profile: skip the profile dispatch
     if random.random() < 0.7:
-        return "normal"
-    else:
-        return random.choice(profiles)
+        return _generate_normal_day(date, previous_day, is_weekend_day)
 
-def generate_realistic_day(date, previous_day=None):
-    """Generate realistic data for a day"""
-    is_weekend_day = is_weekend(date)
-    profile = generate_extreme_profile()
+    # Profile-dependent base values, looked up by (profile code, is_weekend)
+    profile = random.randrange(len(PROFILES))
+    wk = int(is_weekend_day)
 
-    # Sleep
-    if profile == "insomniac":
-        sleep_hours = round(random.uniform(3.0, 5.5), 1)
-    elif profile == "overworker":
-        sleep_hours = round(random.uniform(4.0, 6.5), 1)
-    elif profile == "athlete":
-        sleep_hours = round(random.uniform(7.5, 9.5), 1)
-    elif profile == "healthy":
-        sleep_hours = round(random.uniform(7.0, 8.5), 1)
-    elif is_weekend_day:
-        sleep_hours = round(random.uniform(7.0, 10.0), 1)
-    else:
-        sleep_hours = round(random.uniform(5.5, 9.0), 1)
+    sleep_hours = round(random.uniform(*SLEEP_BOUNDS[profile][wk]), 1)
+    base_steps = random.randint(*STEPS_BOUNDS[profile][wk])
+    base_hydration = random.uniform(*HYDRATION_BOUNDS[profile][wk])
+    base_heart_rate = random.randint(*HEART_BOUNDS[profile][wk])
+    base_screen = random.uniform(*SCREEN_BOUNDS[profile][wk])
+    stress_score = random.uniform(*STRESS_BOUNDS[profile][wk])
+    mood_score = random.uniform(*MOOD_BOUNDS[profile][wk])
 
-    # Steps
-    sleep_bonus = (sleep_hours - 7) * 300
+    return _build_day(date, previous_day, is_weekend_day, sleep_hours, base_steps,
+                      base_hydration, base_heart_rate, base_screen, stress_score, mood_score)
 
-    if profile == "athlete":
-        base_steps = random.randint(15000, 25000)
-    elif profile == "sedentary":
-        base_steps = random.randint(1000, 4000)
-    elif profile == "stressed":
-        base_steps = random.randint(2000, 6000)
-    elif profile == "healthy":
-        base_steps = random.randint(8000, 12000)
-    elif is_weekend_day:
+def _generate_normal_day(date, previous_day, is_weekend_day):
+    """Generate a day for the "normal" profile, with its base values inlined"""
+    if is_weekend_day:
+        sleep_hours = round(random.uniform(7.0, 10.0), 1)
         base_steps = random.randint(3000, 10000)
+        base_screen = random.uniform(4.0, 12.0)
     else:
+        sleep_hours = round(random.uniform(5.5, 9.0), 1)
         base_steps = random.randint(4000, 14000)
+        base_screen = random.uniform(3.0, 10.0)
+
+    return _build_day(date, previous_day, is_weekend_day, sleep_hours, base_steps,
+                      random.uniform(1.5, 3.5), random.randint(55, 80), base_screen, 0.4, 0.5)
 
+def _build_day(date, previous_day, is_weekend_day, sleep_hours, base_steps,
+               base_hydration, base_heart_rate, base_screen, stress_score, mood_score):
+    """Derive the final day record from the profile-dependent base values"""
+    # Steps
+    sleep_bonus = (sleep_hours - 7) * 300
     steps = max(500, int(base_steps + sleep_bonus))
 
     # Hydration
-    if profile == "athlete":
-        base_hydration = random.uniform(3.0, 5.0)
-    elif profile == "stressed":
-        base_hydration = random.uniform(0.8, 1.8)
-    elif profile == "sedentary":
-        base_hydration = random.uniform(1.2, 2.2)
-    else:
-        base_hydration = random.uniform(1.5, 3.5)
-
     activity_boost = max(0, (steps - 5000) / 15000)
     weekend_factor = 1.3 if is_weekend_day else 1.0
     stress_penalty = random.uniform(0.7, 1.1)
@@ -73,15 +148,6 @@ def generate_realistic_day(date, previous_day=None):
     hydration = round(max(0.5, base_hydration * activity_boost * weekend_factor * stress_penalty * weather_factor), 1)
 
     # Heart rate
-    if profile == "athlete":
-        base_heart_rate = random.randint(45, 60)
-    elif profile == "stressed":
-        base_heart_rate = random.randint(75, 90)
-    elif profile == "unhealthy":
-        base_heart_rate = random.randint(70, 85)
-    else:
-        base_heart_rate = random.randint(55, 80)
-
     if sleep_hours < 4:
         sleep_penalty = random.randint(20, 35)
     elif sleep_hours < 6:
@@ -97,34 +163,9 @@ def generate_realistic_day(date, previous_day=None):
     heart_rate = max(40, min(110, base_heart_rate + sleep_penalty - fitness_factor + stress_impact))
 
     # Screen time
-    if profile == "overworker":
-        base_screen = random.uniform(10.0, 16.0)
-    elif profile == "sedentary":
-        base_screen = random.uniform(8.0, 14.0)
-    elif profile == "athlete":
-        base_screen = random.uniform(2.0, 5.0)
-    elif profile == "healthy":
-        base_screen = random.uniform(3.0, 6.0)
-    elif is_weekend_day:
-        base_screen = random.uniform(4.0, 12.0)
-    else:
-        base_screen = random.uniform(3.0, 10.0)
-
     screen_time = round(max(1.0, base_screen + random.uniform(-1.5, 2.0)), 1)
 
-    # Stress
-    if profile == "stressed":
-        stress_score = random.uniform(0.8, 1.2)  # Chronic stress
-    elif profile == "overworker":
-        stress_score = random.uniform(0.7, 1.1)  # Hard worker
-    elif profile == "athlete":
-        stress_score = random.uniform(0.2, 0.6)  # sporty (less stress)
-    elif profile == "healthy":
-        stress_score = random.uniform(0.3, 0.7)  # balanced
-    else:
-        stress_score = 0.4  # Base normale
-
-    # impacts
+    # Stress impacts
     if sleep_hours < 5:
         stress_score += random.uniform(0.4, 0.8)
     if steps < 3000:
@@ -140,28 +181,14 @@ def generate_realistic_day(date, previous_day=None):
     # Final variability
     stress_score += random.uniform(-0.3, 0.4)
 
-    if stress_score < 0.3:
-        stress_level = "low"
-    elif stress_score < 0.75:
-        stress_level = "medium"
-    else:
-        stress_level = "high"
+    stress_code = (stress_score >= 0.3) + (stress_score >= 0.75)
 
     # Mood
-    if profile == "stressed":
-        mood_score = random.uniform(0.2, 0.5)  # Stessed = bad mood
-    elif profile == "athlete":
-        mood_score = random.uniform(0.6, 0.9)  # Sporty = good mood
-    elif profile == "healthy":
-        mood_score = random.uniform(0.5, 0.8)  # Balanced
-    else:
-        mood_score = 0.5
-
     if sleep_hours >= 7:
         mood_score += random.uniform(0.1, 0.3)
-    if stress_level == "low":
+    if stress_code == 0:
         mood_score += random.uniform(0.1, 0.3)
-    elif stress_level == "high":
+    elif stress_code == 2:
         mood_score -= random.uniform(0.3, 0.5)
 
     # Weekend boost
@@ -171,19 +198,15 @@ def generate_realistic_day(date, previous_day=None):
 
     # Continuity with previous day
     if previous_day:
-        if previous_day["mood"] == "good":
+        previous_mood = MOOD_CODE[previous_day["mood"]]
+        if previous_mood == 2:
             mood_score += random.uniform(0.05, 0.2)
-        elif previous_day["mood"] == "bad":
+        elif previous_mood == 0:
             mood_score -= random.uniform(0.05, 0.2)
 
     mood_score += random.uniform(-0.3, 0.3)
 
-    if mood_score < 0.35:
-        mood = "bad"
-    elif mood_score < 0.7:
-        mood = "neutral"
-    else:
-        mood = "good"
+    mood_code = (mood_score >= 0.35) + (mood_score >= 0.7)
 
     return {
         "date": date.strftime("%Y-%m-%d"),
@@ -193,43 +216,190 @@ def generate_realistic_day(date, previous_day=None):
         "hydration_liters": hydration,
         "heart_rate_rest": heart_rate,
         "screen_time_hours": screen_time,
-        "stress_level": stress_level,
-        "mood": mood,
+        "stress_level": STRESS_LABELS[stress_code],
+        "mood": MOOD_LABELS[mood_code],
         "is_weekend": is_weekend_day
     }
 
 def generate_week_data():
     """Generate 7 days of realistic data"""
-    start_date = datetime.now() - timedelta(days=6)
-    week_data = []
-    previous_day = None
-
-    for i in range(7):
-        current_date = start_date + timedelta(days=i)
-        day_data = generate_realistic_day(current_date, previous_day)
-        week_data.append(day_data)
-        previous_day = day_data
+    return generate_dataset(num_days=7)
 
-    return week_data
+def iter_dataset(num_days=1500):
+    """Yield daily health dicts for num_days ending today, with continuity between days."""
+    dates = pd.date_range(end=pd.Timestamp.now().normalize(), periods=num_days, freq="D")
+    weekend = (dates.weekday >= 5).tolist()
+    previous_day = None
+    for current_date, is_weekend_day in zip(dates.to_pydatetime(), weekend):
+        previous_day = generate_realistic_day(current_date, previous_day, is_weekend_day)
+        yield previous_day
 
 def generate_dataset(num_days=1500):
     """Generate a list of daily health dicts for num_days, with continuity between days."""
-    start_date = datetime.now() - timedelta(days=num_days-1)
-    data = []
-    previous_day = None
-    for i in range(num_days):
-        current_date = start_date + timedelta(days=i)
-        day_data = generate_realistic_day(current_date, previous_day)
-        data.append(day_data)
-        previous_day = day_data
-    return data
+    return list(iter_dataset(num_days))
+
+def write_json_stream(output_file, records):
+    """Write any iterable of records (e.g. iter_dataset()) as a JSON array, one record at a time"""
+    with open(output_file, "wb") as f:
+        separator = b"[\n"
+        for record in records:
+            f.write(separator)
+            f.write(orjson.dumps(record))
+            separator = b",\n"
+        f.write(b"\n]\n" if separator == b",\n" else b"[]\n")
+
+def generate_dataset_vec(num_days=1500, seed=None, workers=None):
+    """Vectorized generate_dataset: a DAY_DTYPE array, reproducible for a given seed"""
+    end = pd.Timestamp.now().normalize()
+    sizes = [min(CHUNK_DAYS, num_days - start) for start in range(0, num_days, CHUNK_DAYS)] or [0]
+    days_after = np.cumsum(sizes[::-1])[::-1] - sizes
+    ends = [end - pd.Timedelta(days=int(d)) for d in days_after]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+
+    workers = min(workers or os.cpu_count() or 1, len(sizes))
+    if num_days < PARALLEL_MIN_DAYS or workers < 2:
+        chunks = list(map(_generate_days, sizes, ends, seeds))
+    else:
+        with ProcessPoolExecutor(workers) as pool:
+            chunks = list(pool.map(_generate_days, sizes, ends, seeds))
+
+    # Every chunk walks its mood chain from a neutral first day: re-walk the
+    # head of each chunk from the previous chunk's last mood until both walks
+    # agree, after which the rest of the chain is unchanged
+    for (previous_days, _), (days, candidates) in zip(chunks, chunks[1:]):
+        mood_code = days["mood_code"]
+        previous = previous_days["mood_code"][-1]
+        for i in range(len(days)):
+            previous = candidates[i, previous]
+            if previous == mood_code[i]:
+                break
+            mood_code[i] = previous
+
+    return np.concatenate([days for days, _ in chunks])
+
+def _uniform_int(rng, low, high):
+    """Inclusive integer draw with per-element bounds"""
+    # Scaling one uniform array is much cheaper than Generator.integers with
+    # per-element bounds. floor, not astype: truncating toward zero would bias
+    # ranges that include negatives
+    return np.floor(low + rng.random(len(low)) * (high - low + 1)).astype(np.int64)
+
+def _generate_days(n, end, seed):
+    """Draw n days ending at end; also return the (day, previous mood) -> mood table."""
+    rng = np.random.Generator(np.random.SFC64(seed))
+
+    dates = pd.date_range(end=end, periods=n, freq="D")
+    weekend = dates.weekday.to_numpy() >= 5
+    wk = weekend.astype(np.intp)
+    profiles = rng.choice(len(PROFILES), size=n, p=PROFILE_PROBS)
+
+    def draw(table):
+        return rng.uniform(table[profiles, wk, 0], table[profiles, wk, 1])
+
+    def draw_int(table, index=None):
+        bounds = table[profiles, wk] if index is None else table[index]
+        return _uniform_int(rng, bounds[:, 0], bounds[:, 1])
+
+    def bonus(mask, low, high):
+        return np.where(mask, rng.uniform(low, high, n), 0.0)
+
+    # Sleep
+    sleep_hours = np.round(draw(SLEEP_RANGES), 1)
+
+    # Steps
+    sleep_bonus = (sleep_hours - 7) * 300
+    steps = np.clip((draw_int(STEPS_RANGES) + sleep_bonus).astype(np.int32), 500, None)
+
+    # Hydration: base * activity boost * weekend factor * stress penalty * weather,
+    # accumulated in place to avoid one temporary array per factor
+    hydration = draw(HYDRATION_RANGES)
+    activity_boost = (steps - 5000) / 15000
+    hydration *= np.clip(activity_boost, 0, None, out=activity_boost)
+    hydration *= np.where(weekend, 1.3, 1.0)
+    hydration *= rng.uniform(0.7, 1.1, n)
+    hydration *= rng.uniform(0.8, 1.6, n)
+    hydration = np.round(np.clip(hydration, 0.5, None, out=hydration), 1, out=hydration)
+
+    # Heart rate: one draw from the range of each day's sleep bucket
+    sleep_bucket = np.digitize(sleep_hours, [4, 6]) + (sleep_hours > 10)
+    sleep_penalty = draw_int(SLEEP_PENALTY_RANGES, sleep_bucket)
+    fitness_factor = np.clip((steps - 8000) // 800, -15, 15)
+    stress_impact = (sleep_hours < 6) * 20 + (steps < 3000) * 15
+    heart_rate = np.clip(
+        draw_int(HEART_RANGES) + sleep_penalty - fitness_factor + stress_impact, 40, 110
+    ).astype(np.int16)
+
+    # Screen time
+    screen_time = np.round(np.clip(draw(SCREEN_RANGES) + rng.uniform(-1.5, 2.0, n), 1.0, None), 1)
+
+    # Stress
+    stress_score = draw(STRESS_RANGES)
+    stress_score += bonus(sleep_hours < 5, 0.4, 0.8)
+    stress_score += bonus(steps < 3000, 0.3, 0.6)
+    stress_score += bonus(screen_time > 10, 0.4, 0.7)
+    stress_score -= bonus(weekend, 0.2, 0.6)
+    stress_score += rng.uniform(-0.3, 0.4, n)
+    stress_code = np.digitize(stress_score, [0.3, 0.75])
+
+    # Mood (everything except the continuity term is independent of the previous day)
+    mood_score = draw(MOOD_RANGES)
+    mood_score += bonus(sleep_hours >= 7, 0.1, 0.3)
+    mood_score += bonus(stress_code == 0, 0.1, 0.3)
+    mood_score -= bonus(stress_code == 2, 0.3, 0.5)
+    mood_score += bonus(weekend, 0.1, 0.4)
+    mood_score += rng.uniform(-0.3, 0.3, n)
+    continuity = rng.uniform(0.05, 0.2, n)
+
+    # Bucket the score for each possible previous mood (bad -> -continuity,
+    # neutral -> 0, good -> +continuity), then walk the chain picking the
+    # candidate selected by the previous day's code (day one starts neutral).
+    candidates = np.digitize(
+        mood_score + np.multiply.outer([-1, 0, 1], continuity), [0.35, 0.7]
+    ).T.astype(np.uint8)
+    flat = candidates.ravel().tolist()
+    mood_code = []
+    previous = 1
+    for offset in range(0, 3 * n, 3):
+        previous = flat[offset + previous]
+        mood_code.append(previous)
+
+    days = np.empty(n, dtype=DAY_DTYPE)
+    days["date"] = dates.values
+    days["sleep_hours"] = sleep_hours
+    days["steps"] = steps
+    days["hydration_liters"] = hydration
+    days["heart_rate_rest"] = heart_rate
+    days["screen_time_tenths"] = np.rint(screen_time * 10)
+    days["stress_code"] = stress_code
+    days["mood_code"] = mood_code
+    days["is_weekend"] = weekend
+    return days, candidates
+
+def to_dataframe(days):
+    """Expand a DAY_DTYPE array into the labelled DataFrame layout of generate_dataset."""
+    dates = pd.DatetimeIndex(days["date"])
+    return pd.DataFrame({
+        "date": dates.strftime("%Y-%m-%d"),
+        "day_of_week": dates.day_name(),
+        "sleep_hours": days["sleep_hours"].astype(np.float64).round(1),
+        "steps": days["steps"],
+        "hydration_liters": days["hydration_liters"].astype(np.float64).round(1),
+        "heart_rate_rest": days["heart_rate_rest"],
+        "screen_time_hours": days["screen_time_tenths"] / 10,
+        "stress_level": np.asarray(STRESS_LABELS)[days["stress_code"]],
+        "mood": np.asarray(MOOD_LABELS)[days["mood_code"]],
+        "is_weekend": days["is_weekend"],
+    })
+
+def to_records_dicts(days):
+    """Convert a DAY_DTYPE array to the list-of-dicts format of generate_dataset."""
+    return to_dataframe(days).to_dict(orient="records")
 
 if __name__ == "__main__":
     """Generate sample data for a week for testing and save to file"""
     data = generate_week_data()
     output_file = "src/python/health_data.json"
-    with open(output_file, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
+    write_json_stream(output_file, data)
     print(f"Sample health data generated for 7 days and saved in {output_file}")
     print("\nSummary:")
     for day in data:
@@ -3,13 +3,14 @@
 Simple Equilibri Health Monitoring - Simplified Version
 """
 
-import json
 import cv2
-import time
 import mediapipe as mp
+import numpy as np
+import orjson
 from datetime import datetime
 from pathlib import Path
 import threading
+import atexit
 import signal
 import sys
 import os
@@ -17,7 +18,12 @@ import logging
 import warnings
 
 # Import scoring function from posture_score.py to avoid duplication
-from posture_score import compute_posture_score
+from posture_score import (
+    LEFT_SHOULDER, NOSE, NUM_LANDMARKS, RIGHT_SHOULDER,
+    compute_posture_score_batch, landmarks_to_array
+)
+from frame_grabber import CHECK_FRAME_SIZE, FrameGrabber, is_blank_frame, open_camera, to_rgb
+from checkpoint_log import append_checkpoint, migrate_daily_json
 # Import Ollama AI advisor
 from ollama_advisor import OllamaAdvisor
 
@@ -46,17 +52,53 @@ class SuppressOutput:
 mp_pose = mp.solutions.pose
 mp_drawing = mp.solutions.drawing_utils
 
+# Calibration preview: redraw and show one frame in PREVIEW_EVERY (samples are
+# still taken from every frame)
+PREVIEW_EVERY = 3
+LANDMARK_STYLE = mp_drawing.DrawingSpec(color=(0, 255, 0), thickness=2, circle_radius=2)
+CONNECTION_STYLE = mp_drawing.DrawingSpec(color=(0, 0, 255), thickness=2)
+
+# pollKey (OpenCV >= 4.5) pumps GUI events without the 1 ms wait of waitKey(1)
+poll_key = getattr(cv2, "pollKey", None) or (lambda: cv2.waitKey(1))
+
+# A check whose first sample scores within SCORE_TOLERANCE points of the last
+# full check's average reuses that average instead of taking the other samples
+SCORE_TOLERANCE = 3
+
+def render_calibration_banner():
+    """Yellow calibration banner with its static hint, drawn once and pasted per frame"""
+    banner = np.empty((60, 590, 3), dtype=np.uint8)
+    banner[:] = (0, 255, 255)
+    cv2.putText(banner, "Stay in your ideal position",
+               (10, 45), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 0, 0), 2)
+    return banner
+
+CALIBRATION_BANNER = render_calibration_banner()
+
 class HealthMonitoring:
     def __init__(self):
         self.data_dir = Path("../../data")
         self.data_dir.mkdir(exist_ok=True)
         self.config_file = self.data_dir / "config.json"
         self.daily_file = self.data_dir / "daily.json"
+        self.checkpoints_file = self.data_dir / "checkpoints.jsonl"
+        migrate_daily_json(self.daily_file, self.checkpoints_file)
         self.running = False
+        # Set on shutdown to wake the monitoring thread immediately
+        self.stop_event = threading.Event()
         
         # Camera and pose - keep permanently open
         self.cap = None
-        self.pose = None
+        self.grabber = None
+        self._pose = None
+        self._pose_lock = threading.Lock()
+        self.rgb_buffer = None
+        # Whether a HighGUI window was ever opened (only calibration shows one)
+        self.gui_opened = False
+        # Average score of the last full posture check
+        self.last_score = None
+        # Guards manual_data: the command loop writes it while the monitoring thread saves it
+        self.data_lock = threading.Lock()
         
         # Manual data
         self.manual_data = {
@@ -68,7 +110,7 @@ class HealthMonitoring:
         }
         
         # AI Advisor Ollama
-        self.ai_advisor = OllamaAdvisor(self.daily_file)
+        self.ai_advisor = OllamaAdvisor(self.checkpoints_file)
         
         # Signal handling
         signal.signal(signal.SIGINT, self.signal_handler)
@@ -77,50 +119,74 @@ class HealthMonitoring:
         """Handle Ctrl+C"""
         print("\nStopping monitoring...")
         self.running = False
+        self.stop_event.set()
         
-        # Give final summary with AI
-        self.ai_advisor.give_closing_summary()
+        # Unwind instead of exiting here: the command loop gives the final summary,
+        # and cleanup_camera runs once the monitoring thread has stopped using the camera
+        raise KeyboardInterrupt
         
-        self.cleanup_camera()
-        sys.exit(0)
+    @property
+    def pose(self):
+        """MediaPipe Pose, built on first use and kept for the whole process"""
+        if self._pose is None:
+            with self._pose_lock:
+                if self._pose is None:
+                    with SuppressOutput():
+                        # BlazePose Lite is enough for the nose/shoulder/ear points we score;
+                        # no landmark smoothing since samples are aggregated anyway
+                        pose = mp_pose.Pose(
+                            static_image_mode=False,
+                            model_complexity=0,
+                            smooth_landmarks=False,
+                            enable_segmentation=False,
+                            min_detection_confidence=0.5,
+                            min_tracking_confidence=0.5
+                        )
+                    atexit.register(pose.close)
+                    self._pose = pose
+        return self._pose
         
     def init_camera(self):
-        """Initialize camera and MediaPipe once"""
+        """Initialize camera once"""
+        if self.grabber is not None and self.grabber.stopped.is_set():
+            # The grabber gave up after repeated failed grabs: reopen the device
+            print("Camera stopped responding - reopening")
+            self.grabber = None
+            self.cap.release()
+            self.cap = None
         if self.cap is None:
             print("Initializing camera...")
             with SuppressOutput():
-                self.cap = cv2.VideoCapture(0)
-                self.pose = mp_pose.Pose(
-                    static_image_mode=False,
-                    model_complexity=1,
-                    smooth_landmarks=True,
-                    min_detection_confidence=0.5,
-                    min_tracking_confidence=0.5
-                )
+                self.cap = open_camera(0)
             
             if not self.cap.isOpened():
                 print("Cannot open camera")
+                self.cap.release()
+                self.cap = None
                 return False
+            # Background reader shared by calibration and monitoring
+            self.grabber = FrameGrabber(self.cap)
             print("Camera initialized")
             return True
         return True
         
     def cleanup_camera(self):
         """Clean up camera resources"""
+        if self.grabber is not None:
+            self.grabber.stop()
+            self.grabber = None
         if self.cap is not None:
             self.cap.release()
             self.cap = None
-        if self.pose is not None:
-            self.pose.close()
-            self.pose = None
-        cv2.destroyAllWindows()
+        if self.gui_opened:
+            cv2.destroyAllWindows()
+            self.gui_opened = False
         
     def load_config(self):
         """Load configuration"""
         try:
             if self.config_file.exists():
-                with open(self.config_file, 'r') as f:
-                    return json.load(f)
+                return orjson.loads(self.config_file.read_bytes())
             return {}
         except:
             return {}
@@ -128,8 +194,7 @@ class HealthMonitoring:
     def save_config(self, config):
         """Save configuration"""
         try:
-            with open(self.config_file, 'w') as f:
-                json.dump(config, f, indent=2)
+            self.config_file.write_bytes(orjson.dumps(config, option=orjson.OPT_INDENT_2))
         except Exception as e:
             print(f"Config save error: {e}")
     
@@ -146,60 +211,70 @@ class HealthMonitoring:
             return None
         
         calibration_mode = False
-        calibration_samples = []
-        calibration_head_samples = []
+        # Preallocated sample buffers, filled up to calibration_count
+        calibration_count = 0
+        calibration_samples = np.empty(30, dtype=np.float32)
+        calibration_head_samples = np.empty(30, dtype=np.float32)
         reference_shoulder_width = None
         reference_head_shoulder_ratio = None
 
         print("Camera preview open - position yourself comfortably")
 
+        frame_index = 0
+        landmark_buffer = np.empty((NUM_LANDMARKS, 3), dtype=np.float32)
         while True:
-            ret, frame = self.cap.read()
+            ret, frame = self.grabber.read()
             if not ret:
                 print("Camera read error")
                 break
 
             # Horizontal mirror
             frame = cv2.flip(frame, 1)
-            rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            results = self.pose.process(rgb_frame)
+            # Detect on the same thumbnail size as the posture checks, for comparable references
+            small = cv2.resize(frame, CHECK_FRAME_SIZE, interpolation=cv2.INTER_AREA)
+            self.rgb_buffer = to_rgb(small, self.rgb_buffer)
+            results = self.pose.process(self.rgb_buffer)
+            show = frame_index % PREVIEW_EVERY == 0
+            frame_index += 1
 
             if results.pose_landmarks:
                 # Draw landmarks
-                mp_drawing.draw_landmarks(
-                    frame,
-                    results.pose_landmarks,
-                    mp_pose.POSE_CONNECTIONS,
-                    mp_drawing.DrawingSpec(color=(0, 255, 0), thickness=2, circle_radius=2),
-                    mp_drawing.DrawingSpec(color=(0, 0, 255), thickness=2)
-                )
+                if show:
+                    mp_drawing.draw_landmarks(
+                        frame,
+                        results.pose_landmarks,
+                        mp_pose.POSE_CONNECTIONS,
+                        LANDMARK_STYLE,
+                        CONNECTION_STYLE
+                    )
 
-                # Calculate metrics
-                landmarks = results.pose_landmarks.landmark
-                nose = landmarks[mp_pose.PoseLandmark.NOSE.value]
-                left_shoulder = landmarks[mp_pose.PoseLandmark.LEFT_SHOULDER.value]
-                right_shoulder = landmarks[mp_pose.PoseLandmark.RIGHT_SHOULDER.value]
+                # Calculate metrics on an (x, y, z) array of all landmarks
+                landmarks = landmarks_to_array(results.pose_landmarks.landmark, out=landmark_buffer)
+                left_shoulder = landmarks[LEFT_SHOULDER]
+                right_shoulder = landmarks[RIGHT_SHOULDER]
 
-                shoulder_width = abs(right_shoulder.x - left_shoulder.x)
-                shoulder_mid_y = (left_shoulder.y + right_shoulder.y) / 2
-                head_shoulder_height_ratio = abs(nose.y - shoulder_mid_y)
+                shoulder_width = abs(right_shoulder[0] - left_shoulder[0])
+                shoulder_mid_y = (left_shoulder[1] + right_shoulder[1]) / 2
+                head_shoulder_height_ratio = abs(landmarks[NOSE, 1] - shoulder_mid_y)
 
                 # Calibration mode
                 if calibration_mode:
-                    calibration_samples.append(shoulder_width)
-                    calibration_head_samples.append(head_shoulder_height_ratio)
+                    calibration_samples[calibration_count] = shoulder_width
+                    calibration_head_samples[calibration_count] = head_shoulder_height_ratio
+                    calibration_count += 1
                     
                     # Show calibration status
-                    cv2.rectangle(frame, (10, 10), (600, 70), (0, 255, 255), -1)
-                    cv2.putText(frame, f"CALIBRATING... {len(calibration_samples)}/30", 
-                               (20, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 0, 0), 2)
-                    cv2.putText(frame, "Stay in your ideal position", 
-                               (20, 55), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 0, 0), 2)
+                    if show:
+                        # Clipped to the frame, in case the camera ignored the 640x480 request
+                        roi = frame[10:70, 10:600]
+                        roi[:] = CALIBRATION_BANNER[:roi.shape[0], :roi.shape[1]]
+                        cv2.putText(frame, f"CALIBRATING... {calibration_count}/30", 
+                                   (20, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 0, 0), 2)
 
                     # Calibration complete
-                    if len(calibration_samples) >= 30:
-                        reference_shoulder_width = sum(calibration_samples) / len(calibration_samples)
-                        reference_head_shoulder_ratio = sum(calibration_head_samples) / len(calibration_head_samples)
+                    if calibration_count >= 30:
+                        reference_shoulder_width = float(calibration_samples.mean())
+                        reference_head_shoulder_ratio = float(calibration_head_samples.mean())
                         
                         print(f"\nCalibration complete!")
                         print(f"   Shoulder width: {reference_shoulder_width:.3f}")
@@ -214,25 +289,26 @@ class HealthMonitoring:
                         }
 
                 # Display current metrics
-                shoulder_str = f"Shoulder width: {shoulder_width:.3f}"
-                head_str = f"Head-shoulder ratio: {head_shoulder_height_ratio:.3f}"
-                
-                cv2.rectangle(frame, (10, frame.shape[0] - 80), (500, frame.shape[0] - 10), (0, 0, 0), -1)
-                cv2.putText(frame, shoulder_str, (20, frame.shape[0] - 60), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2)
-                cv2.putText(frame, head_str, (20, frame.shape[0] - 30), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2)
+                if show:
+                    shoulder_str = f"Shoulder width: {shoulder_width:.3f}"
+                    head_str = f"Head-shoulder ratio: {head_shoulder_height_ratio:.3f}"
+                    
+                    frame[-80:-10, 10:500] = 0
+                    cv2.putText(frame, shoulder_str, (20, frame.shape[0] - 60), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2)
+                    cv2.putText(frame, head_str, (20, frame.shape[0] - 30), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2)
 
-            cv2.imshow("Posture Calibration", frame)
+            if show:
+                cv2.imshow("Posture Calibration", frame)
+                self.gui_opened = True
             
-            key = cv2.waitKey(1) & 0xFF
+            key = poll_key() & 0xFF
             if key == ord('c') and not calibration_mode:
                 calibration_mode = True
-                calibration_samples = []
-                calibration_head_samples = []
+                calibration_count = 0
                 print("Calibration started - stay in your ideal position")
             elif key == ord('r'):
                 calibration_mode = False
-                calibration_samples = []
-                calibration_head_samples = []
+                calibration_count = 0
                 print("Calibration reset")
             elif key == ord('q') or key == 27:  # ESC
                 print("Calibration cancelled")
@@ -258,32 +334,52 @@ class HealthMonitoring:
             if not self.init_camera():
                 return None
             
-            scores = []
+            # Landmarks of each detected sample, scored together after capture
+            samples = np.empty((10, NUM_LANDMARKS, 3), dtype=np.float32)
+            sample_count = 0
+            reused_score = None
             
-            # Take 10 samples over 3 seconds
+            # Take 10 samples; the grabber thread keeps the next frame ready
+            # while the current one goes through pose inference
             for i in range(10):
-                ret, frame = self.cap.read()
+                ret, frame = self.grabber.read()
                 if not ret:
                     continue
                 
-                frame = cv2.flip(frame, 1)
-                rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                results = self.pose.process(rgb_frame)
+                # Nothing is displayed here: shrink first so color conversion and
+                # MediaPipe's input copy work on fewer pixels. No mirror flip, the
+                # score only uses y offsets and the absolute shoulder width
+                frame = cv2.resize(frame, CHECK_FRAME_SIZE, interpolation=cv2.INTER_AREA)
+                # A blank frame cannot contain a pose; skip the model
+                if is_blank_frame(frame):
+                    continue
+                self.rgb_buffer = to_rgb(frame, self.rgb_buffer)
+                results = self.pose.process(self.rgb_buffer)
                 
                 if results.pose_landmarks:
-                    # Use imported function from posture_score.py
-                    score_data = compute_posture_score(
-                        results.pose_landmarks.landmark,
-                        ref_shoulder_width,
-                        ref_head_shoulder_ratio
-                    )
-                    # Function returns tuple, take first element (score)
-                    score = score_data[0] if isinstance(score_data, tuple) else score_data
-                    scores.append(score)
-                
-                time.sleep(0.3)
+                    landmarks_to_array(results.pose_landmarks.landmark, out=samples[sample_count])
+                    sample_count += 1
+                    
+                    # Posture unchanged since the last full check: reuse its score
+                    # instead of running the model on the other samples
+                    if sample_count == 1 and self.last_score is not None:
+                        first_score = compute_posture_score_batch(
+                            samples[:1], ref_shoulder_width, ref_head_shoulder_ratio
+                        )[0]
+                        if abs(first_score - self.last_score) <= SCORE_TOLERANCE:
+                            reused_score = self.last_score
+                            break
             
-            avg_score = sum(scores) / len(scores) if scores else None
+            avg_score = reused_score
+            if avg_score is None and sample_count:
+                # Use imported function from posture_score.py
+                scores = compute_posture_score_batch(
+                    samples[:sample_count],
+                    ref_shoulder_width,
+                    ref_head_shoulder_ratio
+                )
+                avg_score = float(scores.mean())
+                self.last_score = avg_score
             
             # Add score to AI and check if it should give advice
             if avg_score is not None:
@@ -299,44 +395,36 @@ class HealthMonitoring:
             print(f"Posture analysis error: {e}")
             return None
     
+    def set_manual_value(self, key, value):
+        """Update one manually entered value"""
+        with self.data_lock:
+            self.manual_data[key] = value
+    
     def save_checkpoint(self, posture_score):
         """Save checkpoint"""
         try:
-            # Load existing data
-            daily_data = {}
-            if self.daily_file.exists():
-                try:
-                    with open(self.daily_file, 'r') as f:
-                        daily_data = json.load(f)
-                except:
-                    daily_data = {}
-            
-            # Create checkpoint
+            # Create checkpoint (one clock read so all fields agree)
+            now = datetime.now()
+            with self.data_lock:
+                manual = dict(self.manual_data)
             checkpoint = {
-                "timestamp": datetime.now().isoformat(),
-                "time": datetime.now().strftime("%H:%M:%S"),
-                "date": datetime.now().strftime("%Y-%m-%d"),
-                "day_of_week": datetime.now().strftime("%A"),
-                "sleep_hours": self.manual_data["sleep_hours"],
-                "steps": self.manual_data["steps"],
-                "hydration_liters": self.manual_data["hydration_liters"],
+                "timestamp": now.isoformat(),
+                "time": now.strftime("%H:%M:%S"),
+                "date": now.strftime("%Y-%m-%d"),
+                "day_of_week": now.strftime("%A"),
+                "sleep_hours": manual["sleep_hours"],
+                "steps": manual["steps"],
+                "hydration_liters": manual["hydration_liters"],
                 "heart_rate_rest": 70,
                 "screen_time_hours": 6.0,
-                "stress_level": self.manual_data["stress_level"],
-                "mood": self.manual_data["mood"],
-                "is_weekend": datetime.now().weekday() >= 5,
+                "stress_level": manual["stress_level"],
+                "mood": manual["mood"],
+                "is_weekend": now.weekday() >= 5,
                 "posture_score": posture_score if posture_score else 0
             }
             
-            # Add to daily data
-            if "checkpoints" not in daily_data:
-                daily_data["checkpoints"] = []
-            daily_data["checkpoints"].append(checkpoint)
-            daily_data["date"] = checkpoint["date"]
-            
-            # Save
-            with open(self.daily_file, 'w') as f:
-                json.dump(daily_data, f, indent=2)
+            # Append to the log instead of rewriting the whole day
+            append_checkpoint(self.checkpoints_file, checkpoint)
             
             return checkpoint
             
@@ -358,15 +446,13 @@ class HealthMonitoring:
                     # Silent analysis failure
                     pass
                 
-                # Wait 30 seconds
-                for i in range(30):
-                    if not self.running:
-                        break
-                    time.sleep(1)
+                # Wait 30 seconds, or less if monitoring is stopped
+                if self.stop_event.wait(30):
+                    break
                     
             except Exception as e:
                 # Silent error
-                time.sleep(5)
+                self.stop_event.wait(5)
     
     def run(self):
         """Main function"""
@@ -415,7 +501,8 @@ class HealthMonitoring:
             steps = input(f"Number of steps (default: {self.manual_data['steps']}): ")
             if steps.strip():
                 self.manual_data["steps"] = int(steps)
-        except:
+        except Exception:
+            # Not KeyboardInterrupt: Ctrl+C here must stop the program, not skip the prompts
             print("Using default values")
         
         # Start monitoring
@@ -428,6 +515,8 @@ class HealthMonitoring:
         print("  quit               - Quit")
         
         self.running = True
+        # A Ctrl+C caught earlier (e.g. during calibration) must not stop the new thread
+        self.stop_event.clear()
         
         # Start monitoring thread
         monitor_thread = threading.Thread(target=self.monitoring_thread, args=(config,))
@@ -441,6 +530,7 @@ class HealthMonitoring:
                 
                 if cmd == "quit":
                     self.running = False
+                    self.stop_event.set()
                     print("Generating final summary...")
                     self.ai_advisor.give_closing_summary()
                     break
@@ -453,14 +543,14 @@ class HealthMonitoring:
                 elif cmd.startswith("hydration "):
                     try:
                         value = float(cmd.split()[1])
-                        self.manual_data["hydration_liters"] = value
+                        self.set_manual_value("hydration_liters", value)
                         print(f"Hydration updated: {value}L")
                     except:
                         print("Invalid format. Use: hydration 2.5")
                 elif cmd.startswith("steps "):
                     try:
                         value = int(cmd.split()[1])
-                        self.manual_data["steps"] = value
+                        self.set_manual_value("steps", value)
                         print(f"Steps updated: {value}")
                     except:
                         print("Invalid format. Use: steps 8000")
@@ -469,16 +559,20 @@ class HealthMonitoring:
                     
             except KeyboardInterrupt:
                 self.running = False
+                self.stop_event.set()
                 print("\nGenerating final summary...")
                 self.ai_advisor.give_closing_summary()
                 break
             except EOFError:
                 self.running = False
+                self.stop_event.set()
                 print("\nGenerating final summary...")
                 self.ai_advisor.give_closing_summary()
                 break
         
         print("\nMonitoring stopped")
+        # Let an in-progress posture check finish before the camera goes away
+        monitor_thread.join(timeout=5)
         self.cleanup_camera()
 
 def main():
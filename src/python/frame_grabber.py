@@ -0,0 +1,129 @@
+"""
+Camera capture helpers shared by the monitoring scripts
+"""
+
+import queue
+import threading
+import time
+
+import cv2
+import numpy as np
+
+# Frame size for background posture checks (and the detection input during
+# calibration): 4:3 like the capture, so the person is not squashed; landmarks
+# are normalized, so scores don't depend on it
+CHECK_FRAME_SIZE = (256, 192)
+
+# Consecutive failed grabs (about 0.1 s apart) before the grabber gives up
+MAX_GRAB_FAILURES = 30
+
+def open_camera(index=0, width=640, height=480, fps=30, warmup_frames=5):
+    """Open a camera tuned for low latency: one-frame buffer, MJPG, fixed size"""
+    cap = cv2.VideoCapture(index)
+    if not cap.isOpened():
+        return cap
+    # Keep only the newest frame in the driver so reads are never stale
+    if not cap.set(cv2.CAP_PROP_BUFFERSIZE, 1):
+        print("Camera backend ignores the buffer size; stale frames are dropped by FrameGrabber instead")
+    cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*'MJPG'))
+    cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+    cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+    cap.set(cv2.CAP_PROP_FPS, fps)
+    # Let auto-exposure settle before any frame is used
+    for _ in range(warmup_frames):
+        cap.grab()
+    return cap
+
+def is_blank_frame(frame, min_stddev=5.0):
+    """True when a frame is nearly uniform (lens covered, lights off), judged on a thumbnail"""
+    gray = cv2.cvtColor(cv2.resize(frame, (64, 48), interpolation=cv2.INTER_AREA), cv2.COLOR_BGR2GRAY)
+    _, stddev = cv2.meanStdDev(gray)
+    return stddev[0, 0] < min_stddev
+
+def to_rgb(frame, out=None):
+    """Convert a BGR frame to RGB into out (reallocated if its shape doesn't match).
+
+    The result is read-only so MediaPipe uses it by reference instead of copying it.
+    """
+    if out is None or out.shape != frame.shape:
+        out = np.empty_like(frame)
+    out.flags.writeable = True
+    cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=out)
+    out.flags.writeable = False
+    return out
+
+class FrameGrabber:
+    """Read frames from a cv2.VideoCapture in a background thread.
+
+    Frames are pushed into a small bounded queue. When the consumer falls
+    behind, the oldest frame is dropped, so read() returns a recent frame
+    instead of one that sat in the camera buffer, and capture/decode overlaps
+    with whatever the consumer does with the previous frame.
+
+    While nobody has called read() for idle_after seconds, frames are only
+    grabbed (which keeps the driver buffer fresh) and not decoded, so an idle
+    grabber between posture checks costs next to no CPU.
+
+    A failed grab is retried; after MAX_GRAB_FAILURES in a row the thread
+    stops and sets stopped, so the owner can reopen the camera.
+    """
+
+    def __init__(self, cap, maxsize=2, idle_after=1.0):
+        self.cap = cap
+        self.frames = queue.Queue(maxsize=maxsize)
+        self.idle_after = idle_after
+        self.last_read = time.monotonic()
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def _idle(self):
+        return time.monotonic() - self.last_read > self.idle_after
+
+    def _drain(self):
+        try:
+            while True:
+                self.frames.get_nowait()
+        except queue.Empty:
+            pass
+
+    def _run(self):
+        failures = 0
+        while not self.stopped.is_set():
+            if not self.cap.grab():
+                failures += 1
+                if failures >= MAX_GRAB_FAILURES:
+                    break
+                self.stopped.wait(0.1)
+                continue
+            failures = 0
+            if self._idle():
+                continue
+            ret, frame = self.cap.retrieve()
+            if not ret:
+                continue
+            if self.frames.full():
+                try:
+                    self.frames.get_nowait()
+                except queue.Empty:
+                    pass
+            self.frames.put(frame)
+        self.stopped.set()
+
+    def read(self, timeout=1.0):
+        """Return (ret, frame) like cv2.VideoCapture.read(), waiting at most timeout seconds"""
+        if self._idle():
+            # Whatever was queued before the idle period is stale
+            self._drain()
+        self.last_read = time.monotonic()
+        if self.stopped.is_set() and self.frames.empty():
+            return False, None
+        try:
+            return True, self.frames.get(timeout=timeout)
+        except queue.Empty:
+            return False, None
+
+    def stop(self):
+        """Stop the reader thread; the capture itself is left open"""
+        self.stopped.set()
+        self.thread.join(timeout=1.0)
@@ -31,7 +31,7 @@ class MLHealthScorer:
                 df_processed[col] = self.label_encoders[col].fit_transform(df_processed[col])
             else:
                 df_processed[col] = self.label_encoders[col].transform(df_processed[col])
-        X = df_processed[self.feature_names].values
+        X = df_processed[self.feature_names].to_numpy(dtype=np.float32)
         if fit_encoders:
             X = self.scaler.fit_transform(X)
         else:
@@ -69,15 +69,19 @@ class MLHealthScorer:
 
     def predict(self, health_data: Dict) -> float:
         """Predict health score for a single day."""
+        return float(self.predict_batch([health_data])[0])
+
+    def predict_batch(self, health_data: List[Dict]) -> np.ndarray:
+        """Predict health scores for several days with a single model call."""
         if not self.is_trained:
             raise RuntimeError("Model not trained. Call train() first.")
-        data_copy = health_data.copy()
-        if 'is_weekend' not in data_copy:
-            data_copy['is_weekend'] = False
-        df = pd.DataFrame([data_copy])
+        df = pd.DataFrame(health_data)
+        if 'is_weekend' not in df:
+            df['is_weekend'] = False
+        else:
+            df['is_weekend'] = df['is_weekend'].fillna(False).astype(bool)
         X = self.preprocess_features(df, fit_encoders=False)
-        predicted_score = self.best_model.predict(X)[0]
-        return float(np.clip(predicted_score, 0, 100))
+        return np.clip(self.best_model.predict(X), 0, 100)
 
     def feature_importance(self) -> Optional[List[Tuple[str, float]]]:
         """Return feature importances if available."""
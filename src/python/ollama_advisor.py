@@ -3,20 +3,22 @@
 Ollama Health Advisor - Intelligent advice based on local AI
 """
 
-import json
 import ollama
+from collections import deque
 from datetime import datetime, timedelta
 from pathlib import Path
 import time
 
+from checkpoint_log import iter_checkpoints
+
 class OllamaAdvisor:
     def __init__(self, data_file_path, model_name="llama3:8b"):
         self.data_file = Path(data_file_path)
         self.model_name = model_name
         self.last_advice_time = 0
         self.advice_cooldown = 300  # 5 minutes minimum between advice
-        self.last_posture_scores = []
         self.max_history = 10  # Keep last 10 scores
+        self.last_posture_scores = deque(maxlen=self.max_history)
         
     def is_ollama_available(self):
         """Check if Ollama is available"""
@@ -48,13 +50,7 @@ class OllamaAdvisor:
     def load_recent_data(self, days=7):
         """Load recent data"""
         try:
-            if not self.data_file.exists():
-                return []
-            
-            with open(self.data_file, 'r') as f:
-                data = json.load(f)
-            
-            checkpoints = data.get("checkpoints", [])
+            checkpoints = iter_checkpoints(self.data_file)
             
             # Filter recent data
             cutoff_date = datetime.now() - timedelta(days=days)
@@ -124,12 +120,9 @@ Respond in English, be concrete and direct. Maximum 3 short sentences."""
     
     def add_posture_score(self, score):
         """Add posture score and analyze trend"""
+        # The deque drops the oldest score once max_history is reached
         self.last_posture_scores.append(score)
         
-        # Keep only recent scores
-        if len(self.last_posture_scores) > self.max_history:
-            self.last_posture_scores.pop(0)
-        
         # Analyze if advice should be given
         if len(self.last_posture_scores) >= 5 and self.should_give_advice():
             return self.check_posture_trend()
@@ -141,7 +134,7 @@ Respond in English, be concrete and direct. Maximum 3 short sentences."""
         if not self.is_ollama_available() or len(self.last_posture_scores) < 3:
             return None
         
-        recent_scores = self.last_posture_scores[-5:]
+        recent_scores = list(self.last_posture_scores)[-5:]
         avg_recent = sum(recent_scores) / len(recent_scores)
         
         # Only give advice if posture is declining or poor
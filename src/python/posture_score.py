@@ -1,10 +1,21 @@
 import cv2
 import mediapipe as mp
 import time
+import numpy as np
+
+from frame_grabber import to_rgb
 
 mp_pose = mp.solutions.pose
 mp_drawing = mp.solutions.drawing_utils
 
+# Landmark indices, resolved once instead of through the enum on every frame
+NUM_LANDMARKS = len(mp_pose.PoseLandmark)
+NOSE = mp_pose.PoseLandmark.NOSE.value
+LEFT_EAR = mp_pose.PoseLandmark.LEFT_EAR.value
+RIGHT_EAR = mp_pose.PoseLandmark.RIGHT_EAR.value
+LEFT_SHOULDER = mp_pose.PoseLandmark.LEFT_SHOULDER.value
+RIGHT_SHOULDER = mp_pose.PoseLandmark.RIGHT_SHOULDER.value
+
 def compute_posture_score(landmarks, reference_shoulder_width=None, reference_head_shoulder_ratio=None):
     """
     Score of posture based on realistic criteria:
@@ -15,11 +26,11 @@ def compute_posture_score(landmarks, reference_shoulder_width=None, reference_he
     - Forward lean detection (head-shoulder height ratio)
     Returns a score between 0 and 100.
     """
-    nose = landmarks[mp_pose.PoseLandmark.NOSE.value]
-    left_shoulder = landmarks[mp_pose.PoseLandmark.LEFT_SHOULDER.value]
-    right_shoulder = landmarks[mp_pose.PoseLandmark.RIGHT_SHOULDER.value]
-    left_ear = landmarks[mp_pose.PoseLandmark.LEFT_EAR.value]
-    right_ear = landmarks[mp_pose.PoseLandmark.RIGHT_EAR.value]
+    nose = landmarks[NOSE]
+    left_shoulder = landmarks[LEFT_SHOULDER]
+    right_shoulder = landmarks[RIGHT_SHOULDER]
+    left_ear = landmarks[LEFT_EAR]
+    right_ear = landmarks[RIGHT_EAR]
 
     # 1. Shoulder alignment (should be to the same height)
     shoulder_diff = abs(left_shoulder.y - right_shoulder.y)
@@ -125,6 +136,59 @@ def compute_posture_score(landmarks, reference_shoulder_width=None, reference_he
 
     return score, shoulder_diff, head_forward_ratio, ear_diff, shoulder_width, distance_status, head_shoulder_height_ratio, forward_lean_detected
 
+def landmarks_to_array(landmarks, out=None):
+    """Copy MediaPipe landmarks into a (33, 3) float32 array of x, y, z"""
+    if out is None:
+        out = np.empty((NUM_LANDMARKS, 3), dtype=np.float32)
+    for i, lm in enumerate(landmarks):
+        out[i] = (lm.x, lm.y, lm.z)
+    return out
+
+def compute_posture_score_batch(landmarks_batch, reference_shoulder_width=None, reference_head_shoulder_ratio=None):
+    """
+    Vectorized compute_posture_score over an (N, 33, 3) landmark array.
+    Returns the N integer scores (same criteria and thresholds as the scalar version).
+    """
+    lm = np.asarray(landmarks_batch, dtype=np.float64)
+    nose_y = lm[:, NOSE, 1]
+    left_shoulder, right_shoulder = lm[:, LEFT_SHOULDER], lm[:, RIGHT_SHOULDER]
+
+    shoulder_diff = np.abs(left_shoulder[:, 1] - right_shoulder[:, 1])
+    head_forward_ratio = nose_y - (left_shoulder[:, 1] + right_shoulder[:, 1]) / 2
+    head_shoulder_height_ratio = np.abs(head_forward_ratio)
+    ear_diff = np.abs(lm[:, LEFT_EAR, 1] - lm[:, RIGHT_EAR, 1])
+    shoulder_width = np.abs(right_shoulder[:, 0] - left_shoulder[:, 0])
+
+    if reference_shoulder_width is not None:
+        min_good_width = reference_shoulder_width * 0.8
+        max_good_width = reference_shoulder_width * 1.2
+    else:
+        min_good_width = 0.22
+        max_good_width = 0.45
+
+    # Each penalty is zero below its threshold, so clipping at 0 replaces the if
+    score = 100 - np.clip((shoulder_diff - 0.03) * 1000, 0, 40)
+    score -= np.clip((head_forward_ratio + 0.02) * 800, 0, 40)
+    score -= np.clip((ear_diff - 0.04) * 800, 0, 50)
+
+    # Forward lean
+    if reference_head_shoulder_ratio is not None:
+        lean = head_shoulder_height_ratio < reference_head_shoulder_ratio * 0.7
+        score -= np.where(lean, np.minimum(40, (reference_head_shoulder_ratio - head_shoulder_height_ratio) * 300), 0)
+    else:
+        score -= np.clip((0.15 - head_shoulder_height_ratio) * 200, 0, 30)
+
+    # Distance
+    score -= np.clip((min_good_width - shoulder_width) * 500, 0, 45)
+    score -= np.clip((shoulder_width - max_good_width) * 200, 0, 25)
+
+    if reference_shoulder_width is not None:
+        width_ratio = shoulder_width / reference_shoulder_width
+        score += np.where((0.95 <= width_ratio) & (width_ratio <= 1.05), 5,
+                          np.where((0.9 <= width_ratio) & (width_ratio <= 1.1), 2, 0))
+
+    return np.clip(np.trunc(score), 0, 100).astype(np.int64)
+
 def main():
     cap = cv2.VideoCapture(0)
 
@@ -144,8 +208,11 @@ def main():
         reference_shoulder_width = None
         reference_head_shoulder_ratio = None
         calibration_mode = False
-        calibration_samples = []
-        calibration_head_samples = []
+        # Calibration samples go into fixed float32 buffers instead of growing lists
+        calibration_samples = np.empty(30, dtype=np.float32)
+        calibration_head_samples = np.empty(30, dtype=np.float32)
+        calibration_count = 0
+        rgb_buffer = None
 
         print("=== Posture Detection ===")
         print("Press 'c' to calibrate your reference distance")
@@ -160,8 +227,9 @@ def main():
             # Flip the frame horizontally for a mirror view
             frame = cv2.flip(frame, 1)
 
-            image = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            results = pose.process(image)
+            # Convert into a buffer reused across frames instead of a new image each time
+            rgb_buffer = to_rgb(frame, rgb_buffer)
+            results = pose.process(rgb_buffer)
 
             current_time = time.time()
 
@@ -182,18 +250,18 @@ def main():
 
                 # Calibration mode
                 if calibration_mode:
-                    calibration_samples.append(shoulder_width)
-                    calibration_head_samples.append(head_shoulder_height_ratio)
+                    calibration_samples[calibration_count] = shoulder_width
+                    calibration_head_samples[calibration_count] = head_shoulder_height_ratio
+                    calibration_count += 1
                     cv2.rectangle(frame, (10, 10), (600, 70), (0, 255, 255), -1)
-                    cv2.putText(frame, f"CALIBRATION... {len(calibration_samples)}/30", (20, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 0, 0), 2)
+                    cv2.putText(frame, f"CALIBRATION... {calibration_count}/30", (20, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 0, 0), 2)
                     cv2.putText(frame, "Stay in a comfortable position", (20, 55), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 0, 0), 2)
 
-                    if len(calibration_samples) >= 30:
-                        reference_shoulder_width = sum(calibration_samples) / len(calibration_samples)
-                        reference_head_shoulder_ratio = sum(calibration_head_samples) / len(calibration_head_samples)
+                    if calibration_count >= 30:
+                        reference_shoulder_width = float(calibration_samples.mean())
+                        reference_head_shoulder_ratio = float(calibration_head_samples.mean())
                         calibration_mode = False
-                        calibration_samples = []
-                        calibration_head_samples = []
+                        calibration_count = 0
                         print(f"Calibration completed! Reference distance: {reference_shoulder_width:.3f}, Head-shoulder ratio: {reference_head_shoulder_ratio:.3f}")
 
                 # Display current metrics
@@ -258,8 +326,7 @@ def main():
                 break
             elif key == ord('c') and results.pose_landmarks:
                 calibration_mode = True
-                calibration_samples = []
-                calibration_head_samples = []
+                calibration_count = 0
                 print("Calibration started! Stay in a comfortable position for 30 measurements...")
             elif key == ord('r'):
                 reference_shoulder_width = None
@@ -3,16 +3,22 @@
 Simple Equilibri Health Monitoring
 """
 
-import json
 import cv2
-import time
 import mediapipe as mp
+import numpy as np
+import orjson
 from datetime import datetime
 from pathlib import Path
 import threading
+import atexit
 
+from frame_grabber import CHECK_FRAME_SIZE, FrameGrabber, is_blank_frame, open_camera, to_rgb
+from checkpoint_log import append_checkpoint, migrate_daily_json
 # Import scoring function from posture_score.py to avoid duplication
-from posture_score import compute_posture_score
+from posture_score import (
+    LEFT_SHOULDER, NOSE, NUM_LANDMARKS, RIGHT_SHOULDER,
+    compute_posture_score_batch, landmarks_to_array
+)
 
 mp_pose = mp.solutions.pose
 mp_drawing = mp.solutions.drawing_utils
@@ -23,7 +29,17 @@ class SimpleMonitoring:
         self.data_dir.mkdir(exist_ok=True)
         self.config_file = self.data_dir / "config.json"
         self.daily_file = self.data_dir / "daily.json"
+        self.checkpoints_file = self.data_dir / "checkpoints.jsonl"
+        migrate_daily_json(self.daily_file, self.checkpoints_file)
         self.running = False
+        # Set on shutdown to wake the monitoring loop immediately
+        self.stop_event = threading.Event()
+        self.pose = None
+        self.cap = None
+        self.grabber = None
+        self.rgb_buffer = None
+        # Held while manual_data is updated by command_handler or copied by save_checkpoint
+        self.data_lock = threading.Lock()
         
         # Manual data defaults
         self.manual_data = {
@@ -38,8 +54,7 @@ class SimpleMonitoring:
         """Load configuration"""
         try:
             if self.config_file.exists():
-                with open(self.config_file, 'r') as f:
-                    return json.load(f)
+                return orjson.loads(self.config_file.read_bytes())
             return {}
         except Exception as e:
             print(f"Error loading config: {e}")
@@ -48,43 +63,79 @@ class SimpleMonitoring:
     def save_config(self, config):
         """Save configuration"""
         try:
-            with open(self.config_file, 'w') as f:
-                json.dump(config, f, indent=2)
+            self.config_file.write_bytes(orjson.dumps(config, option=orjson.OPT_INDENT_2))
         except Exception as e:
             print(f"Error saving config: {e}")
     
+    def get_pose(self):
+        """Return the MediaPipe Pose instance, built once and then reused"""
+        if self.pose is None:
+            # Lite model: the scored nose/shoulder/ear points are found just as well, and
+            # samples are aggregated so no smoothing. Calibration uses the same model so
+            # the reference values are comparable with the checked landmarks
+            self.pose = mp_pose.Pose(model_complexity=0, smooth_landmarks=False)
+            atexit.register(self.pose.close)
+        return self.pose
+    
+    def get_camera(self):
+        """Return the camera's frame grabber, opened once and kept open across monitoring cycles"""
+        if self.grabber is not None and self.grabber.stopped.is_set():
+            # Too many failed grabs in a row: start over with a fresh capture
+            print("Camera stopped responding - reopening")
+            self.release_camera()
+        if self.cap is None:
+            cap = open_camera(0)
+            if not cap.isOpened():
+                cap.release()
+                return None
+            self.cap = cap
+            # One-slot queue: every read gets the newest decoded frame
+            self.grabber = FrameGrabber(cap, maxsize=1)
+        return self.grabber
+    
+    def release_camera(self):
+        """Release the camera if it is open"""
+        if self.grabber is not None:
+            self.grabber.stop()
+            self.grabber = None
+        if self.cap is not None:
+            self.cap.release()
+            self.cap = None
+    
     def calibrate_posture(self):
         """Simple posture calibration"""
         print("Posture calibration - Position yourself correctly")
         print("Press 'c' to calibrate, 'q' to quit")
         
-        cap = cv2.VideoCapture(0)
-        if not cap.isOpened():
+        camera = self.get_camera()
+        if camera is None:
             print("Cannot open camera")
             return None
         
-        pose = mp_pose.Pose()
+        pose = self.get_pose()
         calibration_samples = []
         calibration_head_samples = []
         calibrating = False
         
         while True:
-            ret, frame = cap.read()
+            ret, frame = camera.read()
             if not ret:
                 break
             
             frame = cv2.flip(frame, 1)
-            rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            results = pose.process(rgb_frame)
+            # Same input size as get_posture_score, so the references are comparable
+            small = cv2.resize(frame, CHECK_FRAME_SIZE, interpolation=cv2.INTER_AREA)
+            self.rgb_buffer = to_rgb(small, self.rgb_buffer)
+            results = pose.process(self.rgb_buffer)
             
             if results.pose_landmarks:
                 mp_drawing.draw_landmarks(frame, results.pose_landmarks, mp_pose.POSE_CONNECTIONS)
                 
                 # Calculate metrics
                 landmarks = results.pose_landmarks.landmark
-                nose = landmarks[mp_pose.PoseLandmark.NOSE.value]
-                left_shoulder = landmarks[mp_pose.PoseLandmark.LEFT_SHOULDER.value]
-                right_shoulder = landmarks[mp_pose.PoseLandmark.RIGHT_SHOULDER.value]
+                nose = landmarks[NOSE]
+                left_shoulder = landmarks[LEFT_SHOULDER]
+                right_shoulder = landmarks[RIGHT_SHOULDER]
                 
                 shoulder_width = abs(right_shoulder.x - left_shoulder.x)
                 shoulder_mid_y = (left_shoulder.y + right_shoulder.y) / 2
@@ -105,7 +156,6 @@ class SimpleMonitoring:
                         print(f"Reference shoulder width: {ref_shoulder_width:.3f}")
                         print(f"Reference head-shoulder ratio: {ref_head_shoulder_ratio:.3f}")
                         
-                        cap.release()
                         cv2.destroyAllWindows()
                         
                         return {
@@ -128,7 +178,6 @@ class SimpleMonitoring:
                 calibration_head_samples = []
                 print("Calibration started!")
         
-        cap.release()
         cv2.destroyAllWindows()
         return None
     
@@ -141,76 +190,68 @@ class SimpleMonitoring:
         if not ref_shoulder_width or not ref_head_shoulder_ratio:
             return None
         
-        cap = cv2.VideoCapture(0)
-        if not cap.isOpened():
+        camera = self.get_camera()
+        if camera is None:
             return None
         
-        pose = mp_pose.Pose()
-        scores = []
+        pose = self.get_pose()
+        # Landmarks of the detected samples, scored in one batch below
+        samples = np.empty((10, NUM_LANDMARKS, 3), dtype=np.float32)
+        sample_count = 0
         
-        # Take 10 samples over 2 seconds
+        # Take 10 consecutive samples; the grabber keeps the next frame ready
         for _ in range(10):
-            ret, frame = cap.read()
+            ret, frame = camera.read()
             if not ret:
                 continue
             
-            frame = cv2.flip(frame, 1)
-            rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            results = pose.process(rgb_frame)
+            # No mirror flip: nothing is shown, and the score only uses y offsets and
+            # the absolute shoulder width, which a horizontal flip leaves unchanged
+            frame = cv2.resize(frame, CHECK_FRAME_SIZE, interpolation=cv2.INTER_AREA)
+            if is_blank_frame(frame):
+                continue
+            self.rgb_buffer = to_rgb(frame, self.rgb_buffer)
+            results = pose.process(self.rgb_buffer)
             
             if results.pose_landmarks:
-                # Use complete function from posture_score.py instead of simplified calculation
-                score_data = compute_posture_score(
-                    results.pose_landmarks.landmark,
-                    ref_shoulder_width,
-                    ref_head_shoulder_ratio
-                )
-                # Function returns tuple, take first element (score)
-                score = score_data[0] if isinstance(score_data, tuple) else score_data
-                scores.append(score)
-            
-            time.sleep(0.2)
-        
-        cap.release()
-        cv2.destroyAllWindows()
+                landmarks_to_array(results.pose_landmarks.landmark, out=samples[sample_count])
+                sample_count += 1
         
-        return sum(scores) / len(scores) if scores else None
+        if not sample_count:
+            return None
+        # Use complete function from posture_score.py instead of simplified calculation
+        scores = compute_posture_score_batch(samples[:sample_count], ref_shoulder_width, ref_head_shoulder_ratio)
+        return float(scores.mean())
+    
+    def set_manual_value(self, key, value):
+        """Update one manually entered value"""
+        with self.data_lock:
+            self.manual_data[key] = value
     
     def save_checkpoint(self, posture_score):
         """Save a checkpoint with current data"""
         try:
-            # Load existing data
-            daily_data = {}
-            if self.daily_file.exists():
-                with open(self.daily_file, 'r') as f:
-                    daily_data = json.load(f)
-            
             # Create checkpoint
+            now = datetime.now()
+            with self.data_lock:
+                manual = dict(self.manual_data)
             checkpoint = {
-                "timestamp": datetime.now().isoformat(),
-                "time": datetime.now().strftime("%H:%M:%S"),
-                "date": datetime.now().strftime("%Y-%m-%d"),
-                "day_of_week": datetime.now().strftime("%A"),
-                "sleep_hours": self.manual_data["sleep_hours"],
-                "steps": self.manual_data["steps"],
-                "hydration_liters": self.manual_data["hydration_liters"],
+                "timestamp": now.isoformat(),
+                "time": now.strftime("%H:%M:%S"),
+                "date": now.strftime("%Y-%m-%d"),
+                "day_of_week": now.strftime("%A"),
+                "sleep_hours": manual["sleep_hours"],
+                "steps": manual["steps"],
+                "hydration_liters": manual["hydration_liters"],
                 "heart_rate_rest": 70,  # Default
                 "screen_time_hours": 6.0,  # Default
-                "stress_level": self.manual_data["stress_level"],
-                "mood": self.manual_data["mood"],
-                "is_weekend": datetime.now().weekday() >= 5,
+                "stress_level": manual["stress_level"],
+                "mood": manual["mood"],
+                "is_weekend": now.weekday() >= 5,
                 "posture_score": posture_score if posture_score else 0
             }
             
-            # Add to daily data
-            if "checkpoints" not in daily_data:
-                daily_data["checkpoints"] = []
-            daily_data["checkpoints"].append(checkpoint)
-            daily_data["date"] = checkpoint["date"]
-            
-            # Save
-            with open(self.daily_file, 'w') as f:
-                json.dump(daily_data, f, indent=2)
+            append_checkpoint(self.checkpoints_file, checkpoint)
             
             print(f"Checkpoint saved at {checkpoint['time']} - Posture: {posture_score:.1f}/100")
             
@@ -227,6 +268,7 @@ class SimpleMonitoring:
                 
                 if cmd == "quit":
                     self.running = False
+                    self.stop_event.set()
                     break
                 elif cmd == "status":
                     print(f"Sleep: {self.manual_data['sleep_hours']}h")
@@ -237,21 +279,21 @@ class SimpleMonitoring:
                 elif cmd.startswith("hydration "):
                     try:
                         value = float(cmd.split()[1])
-                        self.manual_data["hydration_liters"] = value
+                        self.set_manual_value("hydration_liters", value)
                         print(f"Hydration updated to {value}L")
                     except:
                         print("Invalid format. Use: hydration 2.5")
                 elif cmd.startswith("steps "):
                     try:
                         value = int(cmd.split()[1])
-                        self.manual_data["steps"] = value
+                        self.set_manual_value("steps", value)
                         print(f"Steps updated to {value}")
                     except:
                         print("Invalid format. Use: steps 8000")
                 elif cmd.startswith("sleep "):
                     try:
                         value = float(cmd.split()[1])
-                        self.manual_data["sleep_hours"] = value
+                        self.set_manual_value("sleep_hours", value)
                         print(f"Sleep updated to {value}h")
                     except:
                         print("Invalid format. Use: sleep 7.5")
@@ -259,7 +301,7 @@ class SimpleMonitoring:
                     try:
                         level = cmd.split()[1]
                         if level in ["low", "medium", "high"]:
-                            self.manual_data["stress_level"] = level
+                            self.set_manual_value("stress_level", level)
                             print(f"Stress updated to {level}")
                         else:
                             print("Use: stress low/medium/high")
@@ -269,7 +311,7 @@ class SimpleMonitoring:
                     try:
                         mood = cmd.split()[1]
                         if mood in ["good", "neutral", "bad"]:
-                            self.manual_data["mood"] = mood
+                            self.set_manual_value("mood", mood)
                             print(f"Mood updated to {mood}")
                         else:
                             print("Use: mood good/neutral/bad")
@@ -302,15 +344,13 @@ class SimpleMonitoring:
                 else:
                     print("❌ Could not analyze posture")
                 
-                # Wait 2 minutes
-                for i in range(120):
-                    if not self.running:
-                        break
-                    time.sleep(1)
+                # Wait 2 minutes, or less if monitoring is stopped
+                if self.stop_event.wait(120):
+                    break
                     
             except Exception as e:
                 print(f"Error in monitoring: {e}")
-                time.sleep(5)
+                self.stop_event.wait(5)
     
     def run(self):
         """Main run function"""
@@ -359,7 +399,11 @@ class SimpleMonitoring:
         
         # Handle commands
         self.command_handler()
+        self.running = False
+        self.stop_event.set()
         
+        monitor_thread.join(timeout=5)
+        self.release_camera()
         print("Monitoring stopped.")
 
 def main():
@@ -370,6 +414,11 @@ def main():
         print("\nProgram interrupted")
     except Exception as e:
         print(f"Error: {e}")
+    finally:
+        try:
+            app.release_camera()
+        except:
+            pass
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,37 @@
+import random
+
+import numpy as np
+import pandas as pd
+
+from data_generator import _uniform_int, generate_dataset, generate_dataset_vec, to_dataframe
+
+def test_uniform_int_covers_negative_ranges_evenly():
+    """Every value of an inclusive range with negative bounds is drawn equally often"""
+    rng = np.random.Generator(np.random.SFC64(0))
+    n = 170000
+    draws = _uniform_int(rng, np.full(n, -8), np.full(n, 8))
+    values, counts = np.unique(draws, return_counts=True)
+    assert values.tolist() == list(range(-8, 9))
+    assert np.abs(counts / (n / 17) - 1).max() < 0.05
+
+def test_vectorized_generator_matches_scalar_distributions():
+    """generate_dataset_vec draws from the same distributions as generate_dataset"""
+    random.seed(0)
+    scalar = pd.DataFrame(generate_dataset(20000))
+    vectorized = to_dataframe(generate_dataset_vec(20000, seed=0, workers=1))
+
+    for column in ["sleep_hours", "steps", "hydration_liters", "heart_rate_rest", "screen_time_hours"]:
+        difference = vectorized[column].mean() - scalar[column].mean()
+        assert abs(difference) < 0.05 * scalar[column].std(), column
+    for column in ["stress_level", "mood"]:
+        shares = pd.concat([
+            scalar[column].value_counts(normalize=True),
+            vectorized[column].value_counts(normalize=True),
+        ], axis=1).fillna(0)
+        assert (shares.iloc[:, 0] - shares.iloc[:, 1]).abs().max() < 0.02, column
+
+def test_vectorized_generator_ignores_worker_count():
+    """The same seed gives the same days whatever the number of worker processes"""
+    serial = generate_dataset_vec(12000, seed=1, workers=1)
+    for workers in (2, 3):
+        assert (generate_dataset_vec(12000, seed=1, workers=workers) == serial).all()
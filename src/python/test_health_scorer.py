@@ -88,4 +88,10 @@ for test in test_cases:
     print(f"   Reference Score: {ref:.1f}/100")
     print(f"   Difference: {abs(pred-ref):.1f} points")
 
+# 5. Batch prediction must agree with single-day prediction
+batch_predictions = scorer.predict_batch([test['data'] for test in test_cases])
+single_predictions = [scorer.predict(test['data']) for test in test_cases]
+assert np.allclose(batch_predictions, single_predictions), "predict_batch disagrees with predict"
+print("\n✓ Batch predictions match single-day predictions")
+
 print("\n✅ ML Health Scorer system is ready for hackathon demo!")
\ No newline at end of file
@@ -12,7 +12,7 @@ def test_ollama_connection():
     print("=" * 40)
     
     # Create advisor with test file
-    data_file = Path("../../data/daily.json")
+    data_file = Path("../../data/checkpoints.jsonl")
     advisor = OllamaAdvisor(data_file)
     
     # Test 1: Ollama connection
@@ -0,0 +1,43 @@
+import types
+
+import numpy as np
+import pytest
+
+mp = pytest.importorskip("mediapipe")
+if not hasattr(mp, "solutions"):
+    pytest.skip("posture_score needs the legacy mediapipe.solutions API", allow_module_level=True)
+
+from posture_score import (
+    LEFT_EAR, LEFT_SHOULDER, NOSE, NUM_LANDMARKS, RIGHT_EAR, RIGHT_SHOULDER,
+    compute_posture_score, compute_posture_score_batch, landmarks_to_array
+)
+
+def random_poses(n, seed=0):
+    """Random landmark arrays with plausible nose, shoulder and ear positions"""
+    rng = np.random.default_rng(seed)
+    poses = rng.uniform(0, 1, (n, NUM_LANDMARKS, 3)).astype(np.float32)
+    poses[:, LEFT_SHOULDER, 0] = rng.uniform(0.2, 0.5, n)
+    poses[:, RIGHT_SHOULDER, 0] = poses[:, LEFT_SHOULDER, 0] + rng.uniform(0.1, 0.5, n)
+    poses[:, LEFT_SHOULDER, 1] = rng.uniform(0.5, 0.6, n)
+    poses[:, RIGHT_SHOULDER, 1] = poses[:, LEFT_SHOULDER, 1] + rng.normal(0, 0.04, n)
+    poses[:, NOSE, 1] = poses[:, LEFT_SHOULDER, 1] - rng.uniform(-0.05, 0.3, n)
+    poses[:, LEFT_EAR, 1] = rng.uniform(0.3, 0.4, n)
+    poses[:, RIGHT_EAR, 1] = poses[:, LEFT_EAR, 1] + rng.normal(0, 0.05, n)
+    return poses
+
+def as_landmarks(pose):
+    """MediaPipe-like landmark objects for one (33, 3) array"""
+    return [types.SimpleNamespace(x=float(x), y=float(y), z=float(z)) for x, y, z in pose]
+
+@pytest.mark.parametrize("ref_w, ref_r", [(None, None), (0.3, 0.2), (0.25, None), (None, 0.1)])
+def test_batch_scores_match_scalar_scores(ref_w, ref_r):
+    """compute_posture_score_batch gives exactly the scores of compute_posture_score"""
+    poses = random_poses(5000)
+    batch = compute_posture_score_batch(poses, ref_w, ref_r)
+    scalar = [compute_posture_score(as_landmarks(pose), ref_w, ref_r)[0] for pose in poses]
+    assert batch.tolist() == scalar
+
+def test_landmarks_to_array_round_trip():
+    """landmarks_to_array copies x, y, z of every landmark"""
+    pose = random_poses(1)[0]
+    assert (landmarks_to_array(as_landmarks(pose)) == pose).all()
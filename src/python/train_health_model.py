@@ -1,9 +1,6 @@
 import sys
 import numpy as np
-import pandas as pd
 import argparse
-from data_generator import generate_dataset
-from ml_health_scorer import MLHealthScorer
 
 def calculate_health_score(row):
     """Calculate health score from raw data (0-100 scale)"""
@@ -54,18 +51,24 @@ def main():
     parser = argparse.ArgumentParser(description='Train ML health scoring model')
     parser.add_argument('--days', '-d', type=int, default=1500,
                        help='Number of synthetic days to generate (default: 1500)')
+    parser.add_argument('--seed', '-s', type=int, default=None,
+                       help='Random seed for reproducible synthetic data')
 
     args = parser.parse_args()
 
+    # Heavy imports (pandas, scikit-learn) are deferred until the arguments are valid
+    from data_generator import generate_dataset_vec, to_dataframe
+    from ml_health_scorer import MLHealthScorer
+
     print(f"🚀 Training ML Health Scorer with {args.days} days of synthetic data")
     print("=" * 60)
 
     # Generate synthetic dataset
     print(f"Generating {args.days} days of synthetic health data...")
-    data_list = generate_dataset(num_days=args.days)
+    days = generate_dataset_vec(num_days=args.days, seed=args.seed)
 
     # Convert to DataFrame
-    df = pd.DataFrame(data_list)
+    df = to_dataframe(days)
     print(f"Generated DataFrame with {len(df)} rows and {len(df.columns)} columns")
 
     # Calculate health scores for each day